@@ -12,15 +12,31 @@
 from __future__ import division, unicode_literals
 import struct
 from datetime import datetime, timedelta
+from operator import itemgetter
 from pylink import link_from_url, SerialLink
 
 from .logger import LOGGER
 from .utils import (cached_property, retry, bytes_to_hex,
-                    ListDict, is_bytes)
+                    ListDict, is_bytes, is_text)
 
 from .parser import (LoopDataParserRevB, DmpHeaderParser, DmpPageParser,
-                     ArchiveDataParserRevB, VantageProCRC, pack_datetime,
-                     unpack_datetime, pack_dmp_date_time)
+                     ArchiveDataParserRevB, crc_ok,
+                     pack_datetime, unpack_datetime, pack_dmp_date_time,
+                     pack_dmp_date_time_to_key, quick_key)
+
+
+# Seconds to wait before reading a page again after a NACK. The NACK
+# itself makes the console resend the page, so no sleep is needed.
+DUMP_RETRY_DELAY = 0
+
+# Precompiled layouts of the EEPROM settings
+_U8 = struct.Struct('<B')
+_HB = struct.Struct('<HB')
+
+# Bounds of the five 52 bytes archive records of a DmpPage
+_RECORD_SLICES = tuple((i, i + 52) for i in range(0, 260, 52))
+# DateStamp of each of these records, read in a single call
+_RECORD_DATE_STAMPS = struct.Struct('<' + 'H50x' * 5)
 
 
 class NoDeviceException(Exception):
@@ -54,18 +70,30 @@ class VantagePro2(object):
     '''
 
     # device reply commands
-    WAKE_STR = '\n'
-    WAKE_ACK = '\n\r'
-    ACK = '\x06'
-    NACK = '\x21'
-    DONE = 'DONE\n\r'
-    CANCEL = '\x18'
-    ESC = '\x1b'
-    OK = '\n\rOK\n\r'
+    WAKE_STR = b'\n'
+    WAKE_ACK = b'\n\r'
+    ACK = b'\x06'
+    NACK = b'\x21'
+    DONE = b'DONE\n\r'
+    CANCEL = b'\x18'
+    ESC = b'\x1b'
+    OK = b'\n\rOK\n\r'
+
+    # device commands
+    _CMD_GETTIME = b'GETTIME\n'
+    _CMD_SETTIME = b'SETTIME\n'
+    _CMD_LOOP1 = b'LOOP 1\n'
+    _CMD_DMPAFT = b'DMPAFT\n'
+    _CMD_VER = b'VER\n'
+    _CMD_NVER = b'NVER\n'
+    _CMD_RXCHECK = b'RXCHECK\n'
 
     def __init__(self, link):
         self.link = link
+        # DmpPage buffer, reused for every page of a dump
+        self._page_buf = bytearray(267)
         self.link.open()
+        self._set_low_latency()
         self._check_revision()
 
     @classmethod
@@ -92,19 +120,73 @@ class VantagePro2(object):
         link.settimeout(timeout)
         return cls(link)
 
+    def _set_low_latency(self):
+        '''Ask the serial driver to hand over received bytes immediately.
+
+        USB-serial converters such as FTDI hold incoming bytes for up to
+        16 ms before passing them on; with `ASYNC_LOW_LATENCY` set this
+        drops to about 1 ms, which shortens every ACK, reply and page
+        round trip. Links without a local serial port (TCP, UDP, ...) or
+        platforms without the flag are left untouched.'''
+        try:
+            self.link.serial.set_low_latency_mode(True)
+        except (AttributeError, NotImplementedError, ValueError, IOError) as e:
+            LOGGER.info(f"Low latency mode not enabled: {e}")
+        else:
+            LOGGER.info("Low latency mode enabled")
+
+    def _read(self, size=None, timeout=None):
+        '''Read from the link and return the data as bytes. (`PyLink`
+        decodes what it reads to text whenever it is valid UTF-8.)'''
+        data = self.link.read(size, timeout)
+        if is_text(data):
+            data = data.encode('utf-8')
+        return data
+
+    def _read_into(self, buf):
+        '''Read `len(buf)` bytes from the link into `buf` and return the
+        number of bytes read.'''
+        try:
+            readinto = self.link.serial.readinto
+        except AttributeError:
+            data = self._read(len(buf))
+            buf[:len(data)] = data
+            return len(data)
+        return readinto(buf)
+
+    def _read_until(self, sep=b'\n\r', limit=128):
+        '''Read a variable length reply until `sep` is received or `limit`
+        bytes have been read, instead of waiting for the read timeout.'''
+        try:
+            # pyserial can do it without a read call per byte
+            return bytes(self.link.serial.read_until(sep, limit))
+        except AttributeError:
+            pass
+        data = bytearray()
+        while len(data) < limit and not data.endswith(sep):
+            byte = self._read(1)
+            if not byte:
+                break
+            data += byte
+        return bytes(data)
+
     @retry(tries=3, delay=1)
     def wake_up(self):
         '''Wakeup the station console.'''
         wait_ack = self.WAKE_ACK
         LOGGER.info("try wake up console")
         self.link.write(self.WAKE_STR)
-        ack = self.link.read(len(wait_ack))
+        ack = self._read(len(wait_ack))
         if wait_ack == ack:
             LOGGER.info(f"Check ACK: OK ({repr(ack)})")
             return True
         # Sometimes we have a 1byte shift from Vantage Pro and that's why wake up doesn't work anymore
-        # We just shift another 1byte to be aligned in the serial buffer again.
-        self.link.read(1)
+        # The byte read to realign the serial buffer usually completes the
+        # ACK, so check it before giving up on this attempt.
+        ack += self._read(1)
+        if wait_ack in ack:
+            LOGGER.info(f"Check ACK: OK ({repr(ack)})")
+            return True
         LOGGER.error(f"Check ACK: BAD ({repr(wait_ack)} != {repr(ack)})")
         raise NoDeviceException()
 
@@ -128,7 +210,7 @@ class VantagePro2(object):
             self.link.write(f"{data}\n")
         if wait_ack is None:
             return True
-        ack = self.link.read(len(wait_ack), timeout=timeout)
+        ack = self._read(len(wait_ack), timeout=timeout)
         if wait_ack == ack:
             LOGGER.info(f"Check ACK: OK ({repr(ack)})")
             return True
@@ -139,12 +221,12 @@ class VantagePro2(object):
     def read_from_eeprom(self, hex_address, size):
         '''Reads from EEPROM the `size` number of bytes starting at the
         `hex_address`. Results are given as hex strings.'''
-        self.link.write(f"EEBRD {hex_address} {size:02d}\n")
-        ack = self.link.read(len(self.ACK))
+        self.link.write(b"EEBRD %s %02d\n" % (hex_address.encode(), size))
+        ack = self._read(len(self.ACK))
         if self.ACK == ack:
             LOGGER.info(f"Check ACK: OK ({repr(ack)})")
-            data = self.link.read(size + 2)  # 2 bytes for CRC
-            if VantageProCRC(data).check():
+            data = self._read(size + 2)  # 2 bytes for CRC
+            if crc_ok(data):
                 return data[:-2]
             else:
                 raise BadCRCException()
@@ -156,21 +238,21 @@ class VantagePro2(object):
     def gettime(self):
         '''Returns the current datetime of the console.'''
         self.wake_up()
-        self.send("GETTIME", self.ACK)
-        data = self.link.read(8)
+        self.send(self._CMD_GETTIME, self.ACK)
+        data = self._read(8)
         return unpack_datetime(data)
 
     def settime(self, dtime):
         '''Set the given `dtime` on the station.'''
         self.wake_up()
-        self.send("SETTIME", self.ACK)
+        self.send(self._CMD_SETTIME, self.ACK)
         self.send(pack_datetime(dtime), self.ACK)
 
     def get_current_data(self):
         '''Returns the real-time data as a `Dict`.'''
         self.wake_up()
-        self.send("LOOP 1", self.ACK)
-        current_data = self.link.read(99)
+        self.send(self._CMD_LOOP1, self.ACK)
+        current_data = self._read(99)
         if self.RevB:
             return LoopDataParserRevB(current_data, datetime.now())
         else:
@@ -185,68 +267,133 @@ class VantagePro2(object):
         :param stop_date: The stopping datetime record.
         '''
         generator = self._get_archives_generator(start_date, stop_date)
-        archives = ListDict()
-        dates = set()
-        # Sets are a tad better for containments
+        return self._sorted_archives(generator)
+
+    def dump_raw(self, path, start_date=None):
+        '''Download archive pages after `start_date` and write them verbatim
+        to `path` (dump header followed by the 267 bytes pages), so that they
+        can be decoded later with `parse_dump` without querying the station
+        again. Returns the number of pages written.
+
+        :param path: The file to write the raw dump to.
+
+        :param start_date: The beginning datetime record.
+        '''
+        self.wake_up()
+        start_date = self._dump_start_date(start_date)
+        header = self._start_dump(start_date)
+        pages = 0
+        with open(path, 'wb') as fd:
+            fd.write(header.raw_bytes)
+            for dump in self._iter_dump_pages(header):
+                fd.write(dump.raw_bytes)
+                pages += 1
+            fd.flush()
+        return pages
+
+    @classmethod
+    def parse_dump(cls, path, start_date=None, stop_date=None):
+        '''Parse archive records from a file written by `dump_raw` and
+        return those until `start_date` and `stop_date` as ListDict.
+
+        :param path: The raw dump file.
+
+        :param start_date: The beginning datetime record.
+
+        :param stop_date: The stopping datetime record.
+        '''
+        start_key = pack_dmp_date_time_to_key(start_date or
+                                              datetime(2001, 1, 1))
+        stop_key = pack_dmp_date_time_to_key(stop_date or datetime.now())
+        with open(path, 'rb') as fd:
+            data = fd.read()
+        return cls._sorted_archives(
+            cls._parse_dump_data(data, start_key, stop_key))
+
+    @classmethod
+    def _parse_dump_data(cls, data, start_key, stop_key):
+        '''Yield records from the complete pages of raw dump `data`.'''
+        for offset in range(6, len(data) - 266, 267):
+            page = data[offset:offset + 267]
+            if not crc_ok(page):
+                LOGGER.error(f'Skip page with bad CRC at offset {offset}')
+                continue
+            dump = DmpPageParser(page, verify_crc=False)
+            yield from cls._process_page(dump, start_key, stop_key)
+
+    @staticmethod
+    def _sorted_archives(generator):
+        '''Drop duplicated records and sort them by datetime.'''
+        # Keep the first record seen for each datetime
+        archives = {}
         for item in generator:
-            if item['Datetime'] not in dates:
-                archives.append(item)
-                dates.add(item['Datetime'])
-        return archives.sorted_by('Datetime')
-    
-    def _process_page(self, page_number, start_date, stop_date):
-        """Processes a single page of the data dump."""
+            archives.setdefault(item['Datetime'], item)
+        return ListDict(sorted(archives.values(), key=itemgetter('Datetime')))
 
-        dump = self._read_dump_page(page_number)
+    @classmethod
+    def _process_page(cls, dump, start_key, stop_key):
+        """Processes a single page of the data dump."""
         raw_records = dump["Records"]
-        for start, end in zip(range(0, 260, 52), range(52, 261, 52)):
+        assert len(raw_records) == 260
+        date_stamps = _RECORD_DATE_STAMPS.unpack(raw_records)
+        for (start, end), date_stamp in zip(_RECORD_SLICES, date_stamps):
+            # Records not written yet are filled with 0xFF
+            if date_stamp == 0xffff:
+                continue
             raw_record = raw_records[start:end]
-            record = self._parse_record(raw_record, start_date, stop_date)
+            record = cls._parse_record(raw_record, start_key, stop_key)
 
             if record:
                 yield record
 
-    def _parse_record(self, raw_record, start_date, stop_date):
+    @staticmethod
+    def _parse_record(raw_record, start_key, stop_key):
         """Parses a raw record, checks its validity, and returns it if it's within the date range."""
-        # Parse the record based on the device revision
-        record_parser = ArchiveDataParserRevB
-        record = record_parser(raw_record)
-
-        # Check record's date validity and range
-        r_time = record['Datetime']
-        if r_time is None:
+        # Check record's date validity and range before parsing it, on the
+        # packed stamps (see `pack_dmp_date_time_to_key`)
+        r_key = quick_key(raw_record)
+        if r_key is None:
             LOGGER.error('Invalid record detected')
             return None
-        if not (start_date < r_time <= stop_date):
+        if not (start_key < r_key <= stop_key):
             LOGGER.info('Record is out of the requested datetime range')
             return None
 
-        # Return the valid record
-        return record
+        # Parse the record based on the device revision
+        record_parser = ArchiveDataParserRevB
+        return record_parser(raw_record)
 
     def _get_archives_generator(self, start_date=None, stop_date=None):
         '''Get archive records generator until `start_date` and `stop_date`.'''
         self.wake_up()
-        # Set default dates if none provided
+        start_date = self._dump_start_date(start_date)
+        start_key = pack_dmp_date_time_to_key(start_date)
+        stop_key = pack_dmp_date_time_to_key(stop_date or datetime.now())
+        header = self._start_dump(start_date)
+        for dump in self._iter_dump_pages(header):
+            yield from self._process_page(dump, start_key, stop_key)
+
+    def _dump_start_date(self, start_date):
+        '''Round down `start_date` to the nearest archive period.'''
+        # Set default date if none provided
         start_date = start_date or datetime(2001, 1, 1)
-        stop_date = stop_date or datetime.now()
-
-        # Round down start_date to the nearest archive period
         period = self.archive_period
-        start_date -= timedelta(minutes=start_date.minute % period)
+        return start_date - timedelta(minutes=start_date.minute % period)
 
+    def _start_dump(self, start_date):
+        '''Request a data dump after `start_date` and return its header.'''
         # Send command to initiate data dump after start_date
-        self.send("DMPAFT", self.ACK)
+        self.send(self._CMD_DMPAFT, self.ACK)
         packed_date = pack_dmp_date_time(start_date)
         self.link.write(packed_date)
 
         # Await acknowledgment with a 2-second timeout
         # Shouldn't be any lower than 2 but unsure why
-        if self.link.read(len(self.ACK), timeout=2) != self.ACK:
+        if self._read(len(self.ACK), timeout=2) != self.ACK:
             raise BadAckException('No acknowledgment received for the data dump request.')
 
         # Read and parse the dump header
-        header_data = self.link.read(6)
+        header_data = self._read(6)
         header = DmpHeaderParser(header_data)
         if header.crc_error:
             self.link.write(self.CANCEL)
@@ -254,28 +401,31 @@ class VantagePro2(object):
 
         # Send acknowledgment if header CRC is correct
         self.link.write(self.ACK)
-        
+        return header
+
+    def _iter_dump_pages(self, header):
+        '''Yield the checked pages announced by the dump `header`. Each page
+        must be consumed before the next one is requested.'''
         try:
-            for i in range(header.number_of_pages):
-                # Not sure if these functions need to be public.
-                self._process_page(i, start_date, stop_date)
-        except (BadCRCException, NotImplementedError) as e:
+            for i in range(header['Pages']):
+                yield self._read_dump_page()
+        except (BadCRCException, BadDataException) as e:
             LOGGER.error(f'Error during data processing: {e}')
             self.link.write(self.ESC)
-            return 
+            return
 
         LOGGER.info('Data dump complete.')
 
     @cached_property
     def archive_period(self):
         '''Returns number of minutes in the archive period.'''
-        return struct.unpack(b'B', self.read_from_eeprom("2D", 1))[0]
+        return _U8.unpack(self.read_from_eeprom("2D", 1))[0]
 
     @cached_property
     def timezone(self):
         '''Returns timezone offset as string.'''
         data = self.read_from_eeprom("14", 3)
-        offset, gmt = struct.unpack(b'HB', data)
+        offset, gmt = _HB.unpack(data)
         if gmt:
             return f"GMT+{offset / 100:.2f}"
         else:
@@ -285,42 +435,47 @@ class VantagePro2(object):
     def firmware_date(self):
         '''Return the firmware date code'''
         self.wake_up()
-        self.send("VER", self.OK)
-        data = self.link.read(13)
-        return datetime.strptime(data.strip('\n\r'), '%b %d %Y').date()
+        self.send(self._CMD_VER, self.OK)
+        data = self._read(13)
+        data = data.strip(b'\n\r').decode('ascii')
+        return datetime.strptime(data, '%b %d %Y').date()
 
     @cached_property
     def firmware_version(self):
         '''Returns the firmware version as string'''
         self.wake_up()
-        self.send("NVER", self.OK)
-        data = self.link.read(6)
-        return data.strip('\n\r')
+        self.send(self._CMD_NVER, self.OK)
+        data = self._read_until()
+        return data.strip(b'\n\r').decode('ascii')
 
     @cached_property
     def diagnostics(self):
         '''Return the Console Diagnostics report. (RXCHECK command)'''
         self.wake_up()
-        self.send("RXCHECK", self.OK)
-        data = self.link.read().strip('\n\r').split(' ')
+        self.send(self._CMD_RXCHECK, self.OK)
+        data = self._read_until().strip(b'\n\r').split(b' ')
         data = [int(i) for i in data]
         return dict(total_received=data[0], total_missed=data[1],
                     resyn=data[2], max_received=data[3],
                     crc_errors=data[4])
 
-    @retry(tries=3, delay=1)
+    @retry(tries=3, delay=lambda: DUMP_RETRY_DELAY)
     def _read_dump_page(self):
-        '''Read, parse and check a DmpPage.'''
-        raw_dump = self.link.read(267)
-        if len(raw_dump) != 267:
+        '''Read, parse and check a DmpPage.
+
+        The page is acknowledged as soon as its CRC is verified, so the
+        console starts sending the next page while this one is parsed.
+        Every page is read into the same buffer: the returned DmpPage is
+        only valid until the next one is read.'''
+        if self._read_into(self._page_buf) != 267:
             self.link.write(self.NACK)
             raise BadDataException()
+        elif not crc_ok(self._page_buf):
+            self.link.write(self.NACK)
+            raise BadCRCException()
         else:
-            dump = DmpPageParser(raw_dump)
-            if dump.crc_error:
-                self.link.write(self.NACK)
-                raise BadCRCException()
-            return dump
+            self.link.write(self.ACK)
+            return DmpPageParser(self._page_buf, verify_crc=False)
 
     def _check_revision(self):
         '''Check firmware date and get data format revision.'''
@@ -12,49 +12,42 @@
 '''
 from __future__ import division, unicode_literals
 import struct
+import binascii
 from datetime import datetime
-from array import array
+from functools import lru_cache
+from itertools import chain
 
-from .compat import bytes
 from .logger import LOGGER
-from .utils import (cached_property, bytes_to_hex, Dict, bytes_to_binary,
-                    binary_to_int, list_to_int)
+from .utils import cached_property, Dict
+
+
+# Precompiled layouts of the fixed size fields
+_CRC = struct.Struct('>H')
+_DMP_DATE_TIME = struct.Struct('<HH')
+_DATETIME = struct.Struct('>BBBBBB')
+_STORM_DATE = struct.Struct('<H')
+
+
+def crc16_ccitt(data, crc=0):
+    '''Return the CRC-CCITT (polynomial 0x1021) of `data`, as used by the
+    Davis Vantage Pro unit. Delegates to the C implementation shipped with
+    `binascii`.'''
+    return binascii.crc_hqx(data, crc)
+
+
+def crc_ok(data):
+    '''Return True if `data` ends with its valid CRC (a CRC of 0).'''
+    return len(data) != 0 and crc16_ccitt(data) == 0
+
+
+def append_crc(data):
+    '''Return `data` followed by its packed CRC.'''
+    return bytes(data) + _CRC.pack(crc16_ccitt(data))
 
 
 class VantageProCRC(object):
     '''Implements CRC algorithm, necessary for encoding and verifying data from
     the Davis Vantage Pro unit.'''
-    CRC_TABLE = (
-        0x0,    0x1021, 0x2042, 0x3063, 0x4084, 0x50a5, 0x60c6, 0x70e7, 0x8108,
-        0x9129, 0xa14a, 0xb16b, 0xc18c, 0xd1ad, 0xe1ce, 0xf1ef, 0x1231, 0x210,
-        0x3273, 0x2252, 0x52b5, 0x4294, 0x72f7, 0x62d6, 0x9339, 0x8318, 0xb37b,
-        0xa35a, 0xd3bd, 0xc39c, 0xf3ff, 0xe3de, 0x2462, 0x3443, 0x420,  0x1401,
-        0x64e6, 0x74c7, 0x44a4, 0x5485, 0xa56a, 0xb54b, 0x8528, 0x9509, 0xe5ee,
-        0xf5cf, 0xc5ac, 0xd58d, 0x3653, 0x2672, 0x1611, 0x630,  0x76d7, 0x66f6,
-        0x5695, 0x46b4, 0xb75b, 0xa77a, 0x9719, 0x8738, 0xf7df, 0xe7fe, 0xd79d,
-        0xc7bc, 0x48c4, 0x58e5, 0x6886, 0x78a7, 0x840,  0x1861, 0x2802, 0x3823,
-        0xc9cc, 0xd9ed, 0xe98e, 0xf9af, 0x8948, 0x9969, 0xa90a, 0xb92b, 0x5af5,
-        0x4ad4, 0x7ab7, 0x6a96, 0x1a71, 0xa50,  0x3a33, 0x2a12, 0xdbfd, 0xcbdc,
-        0xfbbf, 0xeb9e, 0x9b79, 0x8b58, 0xbb3b, 0xab1a, 0x6ca6, 0x7c87, 0x4ce4,
-        0x5cc5, 0x2c22, 0x3c03, 0xc60,  0x1c41, 0xedae, 0xfd8f, 0xcdec, 0xddcd,
-        0xad2a, 0xbd0b, 0x8d68, 0x9d49, 0x7e97, 0x6eb6, 0x5ed5, 0x4ef4, 0x3e13,
-        0x2e32, 0x1e51, 0xe70,  0xff9f, 0xefbe, 0xdfdd, 0xcffc, 0xbf1b, 0xaf3a,
-        0x9f59, 0x8f78, 0x9188, 0x81a9, 0xb1ca, 0xa1eb, 0xd10c, 0xc12d, 0xf14e,
-        0xe16f, 0x1080, 0xa1,   0x30c2, 0x20e3, 0x5004, 0x4025, 0x7046, 0x6067,
-        0x83b9, 0x9398, 0xa3fb, 0xb3da, 0xc33d, 0xd31c, 0xe37f, 0xf35e, 0x2b1,
-        0x1290, 0x22f3, 0x32d2, 0x4235, 0x5214, 0x6277, 0x7256, 0xb5ea, 0xa5cb,
-        0x95a8, 0x8589, 0xf56e, 0xe54f, 0xd52c, 0xc50d, 0x34e2, 0x24c3, 0x14a0,
-        0x481,  0x7466, 0x6447, 0x5424, 0x4405, 0xa7db, 0xb7fa, 0x8799, 0x97b8,
-        0xe75f, 0xf77e, 0xc71d, 0xd73c, 0x26d3, 0x36f2, 0x691,  0x16b0, 0x6657,
-        0x7676, 0x4615, 0x5634, 0xd94c, 0xc96d, 0xf90e, 0xe92f, 0x99c8, 0x89e9,
-        0xb98a, 0xa9ab, 0x5844, 0x4865, 0x7806, 0x6827, 0x18c0, 0x8e1,  0x3882,
-        0x28a3, 0xcb7d, 0xdb5c, 0xeb3f, 0xfb1e, 0x8bf9, 0x9bd8, 0xabbb, 0xbb9a,
-        0x4a75, 0x5a54, 0x6a37, 0x7a16, 0xaf1,  0x1ad0, 0x2ab3, 0x3a92, 0xfd2e,
-        0xed0f, 0xdd6c, 0xcd4d, 0xbdaa, 0xad8b, 0x9de8, 0x8dc9, 0x7c26, 0x6c07,
-        0x5c64, 0x4c45, 0x3ca2, 0x2c83, 0x1ce0, 0xcc1,  0xef1f, 0xff3e, 0xcf5d,
-        0xdf7c, 0xaf9b, 0xbfba, 0x8fd9, 0x9ff8, 0x6e17, 0x7e36, 0x4e55, 0x5e74,
-        0x2e93, 0x3eb2, 0xed1,  0x1ef0,
-    )
 
     def __init__(self, data):
         self.data = data
@@ -62,36 +55,17 @@ class VantageProCRC(object):
     @cached_property
     def checksum(self):
         '''Return CRC calc value from raw serial data.'''
-        crc = 0
-        
-        # Previous one-liner wasn't great for readability
-        for byte in array('B', bytes(self.data)):
-            # Get the upper 8 bits
-            upper_crc = crc >> 8
-
-            # XOR the upper_crc with the current byte to index into the CRC table.
-            table_index = upper_crc ^ byte
-            table_value = self.CRC_TABLE[table_index]
-            # Get the lower 8 bits of the current CRC.
-            lower_crc = crc & 0xFF
-
-            # Shift 8 bits to the left to make space for the new byte.
-            shifted_lower_crc = lower_crc << 8
-
-            # Combine the table value with the shifted lower CRC to get the new CRC value.
-            crc = table_value ^ shifted_lower_crc
-        return crc
+        return crc16_ccitt(self.data)
 
     @cached_property
     def data_with_checksum(self):
         '''Return packed raw CRC from raw data.'''
-        checksum = struct.pack(b'>H', self.checksum)
-        return b''.join([self.data, checksum])
+        return append_crc(self.data)
 
     def check(self):
         '''Perform CRC check on raw serial data, return true if valid.
         A valid CRC == 0.'''
-        if len(self.data) != 0 and self.checksum == 0:
+        if crc_ok(self.data):
             LOGGER.info("Check CRC : OK")
             return True
         else:
@@ -103,30 +77,56 @@ class DataParser(Dict):
     '''Implements a reusable class for working with a binary data structure.
     It provides a named fields interface, similiar to C structures.'''
 
-    def __init__(self, data, data_format, order='='):
+    # Field names and compiled Struct of each data format
+    _layouts = {}
+
+    # Names given by `tuple_to_dict` to the items of byte string fields
+    _EXPANDED = {}
+
+    def __init__(self, data, data_format, order='=', verify_crc=True):
         super(DataParser, self).__init__()
-        self.fields, format_t = zip(*data_format)
+        self.fields, self.struct = self._layout(data_format, order)
         self.crc_error = False
-        if "CRC" in self.fields:
-            self.crc_error = not VantageProCRC(data).check()
-        format_t = f"{order}{''.join(format_t)}"
-        self.struct = struct.Struct(format=format_t)
+        if verify_crc and "CRC" in self.fields:
+            self.crc_error = not crc_ok(data)
+            if self.crc_error:
+                LOGGER.error("Check CRC : BAD")
         # save raw_bytes
         self.raw_bytes = data
         # Unpacks data from `raw_bytes` and returns a dication of named fields
         data = self.struct.unpack_from(self.raw_bytes, 0)
-        self['Datetime'] = None
-        self.update(Dict(zip(self.fields, data)))
-
-    @cached_property
+        self.update(chain((('Datetime', None),), zip(self.fields, data)))
+
+    @classmethod
+    def _layout(cls, data_format, order):
+        '''Return the field names and the `Struct` of `data_format`, computed
+        only once.'''
+        key = (data_format, order)
+        layout = cls._layouts.get(key)
+        if layout is None:
+            fields, format_t = zip(*data_format)
+            format_t = f"{order}{''.join(format_t)}"
+            layout = (fields, struct.Struct(format_t))
+            cls._layouts[key] = layout
+        return layout
+
+    @property
     def raw(self):
-        return bytes_to_hex(self.raw_bytes)
+        '''Hex string of `raw_bytes`, computed on each access.'''
+        return self.raw_bytes.hex(' ').upper()
+
+    def scale(self, scales):
+        '''Divide each field of `scales` (name, divisor) pairs in one pass.'''
+        for key, divisor in scales:
+            self[key] /= divisor
 
     def tuple_to_dict(self, key):
         '''Convert {key<->tuple} to {key1<->value2, key2<->value2 ... }.'''
-        for i, value in enumerate(self[key]):
-            self[f"{key}{i + 1:02d}"] = value
-        del self[key]
+        values = self.pop(key)
+        names = self._EXPANDED.get(key)
+        if names is None:
+            names = [f"{key}{i + 1:02d}" for i in range(len(values))]
+        self.update(zip(names, values))
 
     def __unicode__(self):
         name = self.__class__.__name__
@@ -139,6 +139,94 @@ class DataParser(Dict):
         return str(self.__unicode__())
 
 
+def _expand_names(data_format, keys):
+    '''Return the names `tuple_to_dict` gives to the items of the `keys` byte
+    string fields of `data_format`.'''
+    sizes = dict(data_format)
+    return dict((key, tuple(f"{key}{i + 1:02d}"
+                            for i in range(int(sizes[key][:-1]))))
+                for key in keys)
+
+
+# Map the binary to alarm attributes
+# Using a dict with keys make any future adjustments easier over list index
+_TYPE_KEYS = {
+    "AlarmIn": {
+        0: "FallBarTrend",
+        1: "RisBarTrend",
+        2: "LowTemp",
+        3: "HighTemp",
+        4: "LowHum",
+        5: "HighHum",
+        6: "Time"
+    },
+    "AlarmRain": {
+        0: 'HighRate', 
+        1: '15min', 
+        2: '24hour', 
+        3: 'StormTotal', 
+        4: 'ETDaily'
+    },
+    "AlarmOut72": {
+        0: "LowTemp", 
+        1: "HighTemp", 
+        2: "WindSpeed", 
+        3: "10minAvgSpeed",
+        4: "LowDewpoint",
+        5: "HighDewPoint",
+        6: "HighHeat",
+        7: "LowWindChill"
+    },
+    "AlarmOut73": {
+        0: "HighTHSW", 
+        1: "HighSolarRad", 
+        2: "HighUV", 
+        3: "UVDose",
+        4: "UVDoseEnabled"
+    },
+    "AlarmExTempHum": {
+        0: "LowTemp", 
+        1: "HighTemp", 
+        2: "LowHum", 
+        3: "HighHum"
+    },
+    "AlarmSoilLeaf": {
+        0: "LowLeafWet", 
+        1: "HighLeafWet", 
+        2: "LowSoilMois",
+        3: "HighSoilMois", 
+        4: "LowLeafTemp", 
+        5: "HighLeafTemp",
+        6: "LowSoilTemp", 
+        7: "HighSoilTemp"
+    }
+}
+
+# Alarm attribute names of each alarm type with the shift of their bit,
+# index 0 being the most significant bit
+_FLAT_KEYS = dict((type_name, tuple((keys[index], 7 - index)
+                                    for index in sorted(keys)))
+                  for type_name, keys in _TYPE_KEYS.items())
+
+
+# These fields rarely change between LOOP packets, so their strings are cached
+@lru_cache(maxsize=1024)
+def _unpack_storm_date(date):
+    '''Given a packed storm date word, unpack and return date.'''
+    year = (date & 0x7f) + 2000           # 7 bits
+    day = (date >> 7) & 0x1f              # 5 bits
+    month = (date >> 12) & 0x0f           # 4 bits
+    return f"{year}-{month}-{day}"
+
+
+@lru_cache(maxsize=1024)
+def _unpack_time(time):
+    '''Given a packed time field, unpack and return "HH:MM" string.'''
+    # format: HHMM, and space padded on the left.ex: "601" is 6:01 AM
+    hours, minutes = divmod(time, 100)
+    return f"{hours:02d}:{minutes:02d}"  # covert to "06:01"
+
+
 class LoopDataParserRevB(DataParser):
     '''Parse data returned by the 'LOOP' command. It contains all of the
     real-time data that can be read from the Davis VantagePro2.'''
@@ -160,117 +248,62 @@ class LoopDataParserRevB(DataParser):
         ('SunSet', 'H'), ('EOL', '2s'), ('CRC', 'H'),
     )
     
+    # Item names of the fields passed to tuple_to_dict
+    _EXPANDED = _expand_names(LOOP_FORMAT, (
+        'ExtraTemps', 'LeafTemps', 'SoilTemps', 'HumExtra', 'LeafWetness',
+        'SoilMoist'))
+
     # Map the binary to alarm attributes
-    # Using a dict with keys make any future adjustments easier over list index
-    type_keys = {
-        "AlarmIn": {
-            0: "FallBarTrend",
-            1: "RisBarTrend",
-            2: "LowTemp",
-            3: "HighTemp",
-            4: "LowHum",
-            5: "HighHum",
-            6: "Time"
-        },
-        "AlarmRain": {
-            0: 'HighRate', 
-            1: '15min', 
-            2: '24hour', 
-            3: 'StormTotal', 
-            4: 'ETDaily'
-        },
-        "AlarmOut72": {
-            0: "LowTemp", 
-            1: "HighTemp", 
-            2: "WindSpeed", 
-            3: "10minAvgSpeed",
-            4: "LowDewpoint",
-            5: "HighDewPoint",
-            6: "HighHeat",
-            7: "LowWindChill"
-        },
-        "AlarmOut73": {
-            0: "HighTHSW", 
-            1: "HighSolarRad", 
-            2: "HighUV", 
-            3: "UVDose",
-            4: "UVDoseEnabled"
-        },
-        "AlarmExTempHum": {
-            0: "LowTemp", 
-            1: "HighTemp", 
-            2: "LowHum", 
-            3: "HighHum"
-        },
-        "AlarmSoilLeaf": {
-            0: "LowLeafWet", 
-            1: "HighLeafWet", 
-            2: "LowSoilMois",
-            3: "HighSoilMois", 
-            4: "LowLeafTemp", 
-            5: "HighLeafTemp",
-            6: "LowSoilTemp", 
-            7: "HighSoilTemp"
-        }
-    }
+    type_keys = _TYPE_KEYS
+
+    # Divisors of the scaled fields
+    _SCALES = (
+        ('Barometer', 1000), ('TempIn', 10), ('TempOut', 10),
+        ('RainRate', 100), ('RainStorm', 100),
+        # rain totals
+        ('RainDay', 100), ('RainMonth', 100), ('RainYear', 100),
+        # evapotranspiration totals
+        ('ETDay', 1000), ('ETMonth', 100), ('ETYear', 100),
+    )
 
     def __init__(self, data, dtime):
         super(LoopDataParserRevB, self).__init__(data, self.LOOP_FORMAT)
         self['Datetime'] = dtime
-        self['Barometer'] = self['Barometer'] / 1000
-        self['TempIn'] = self['TempIn'] / 10
-        self['TempOut'] = self['TempOut'] / 10
-        self['RainRate'] = self['RainRate'] / 100
-        self['RainStorm'] = self['RainStorm'] / 100
+        self.scale(self._SCALES)
         # Given a packed storm date field, unpack and return date
         self['StormStartDate'] = self.unpack_storm_date()
-        # rain totals
-        self['RainDay'] = self['RainDay'] / 100
-        self['RainMonth'] = self['RainMonth'] / 100
-        self['RainYear'] = self['RainYear'] / 100
-        # evapotranspiration totals
-        self['ETDay'] = self['ETDay'] / 1000
-        self['ETMonth'] = self['ETMonth'] / 100
-        self['ETYear'] = self['ETYear'] / 100
         # battery statistics
         self['BatteryVolts'] = self['BatteryVolts'] * 300 / 512 / 100
         # sunrise / sunset
-        self['SunRise'] = self.unpack_time(self['SunRise'])
-        self['SunSet'] = self.unpack_time(self['SunSet'])
+        self['SunRise'] = _unpack_time(self['SunRise'])
+        self['SunSet'] = _unpack_time(self['SunSet'])
         # convert to int
-        self['HumExtra'] = struct.unpack(b'7B', self['HumExtra'])
-        self['ExtraTemps'] = struct.unpack(b'7B', self['ExtraTemps'])
-        self['SoilMoist'] = struct.unpack(b'4B', self['SoilMoist'])
-        self['SoilTemps'] = struct.unpack(b'4B', self['SoilTemps'])
-        self['LeafWetness'] = struct.unpack(b'4B', self['LeafWetness'])
-        self['LeafTemps'] = struct.unpack(b'4B', self['LeafTemps'])
+        self['HumExtra'] = tuple(self['HumExtra'])
+        self['ExtraTemps'] = tuple(self['ExtraTemps'])
+        self['SoilMoist'] = tuple(self['SoilMoist'])
+        self['SoilTemps'] = tuple(self['SoilTemps'])
+        self['LeafWetness'] = tuple(self['LeafWetness'])
+        self['LeafTemps'] = tuple(self['LeafTemps'])
+        # Alarm bytes 70 to 85, their bits are tested with shifts
+        alarm_bytes = self.raw_bytes[70:86]
         # Inside Alarms bits extraction, only 7 bits are used
-        # Convert the byte at position X to its binary representation then to ints
-        alarm_in_values = list_to_int(bytes_to_binary(self.raw_bytes[70]))
+        self.index_loop_through_data("AlarmIn", alarm_bytes[0], alarm_key="AlarmIn")
         # Rain Alarms bits extraction, only 5 bits are used
-        alarm_rain_values = list_to_int(bytes_to_binary(self.raw_bytes[71]))
-        alarm_out_72 = list_to_int(bytes_to_binary(self.raw_bytes[72]))
-        alarm_out_73 = list_to_int(bytes_to_binary(self.raw_bytes[73]))
+        self.index_loop_through_data("AlarmRain", alarm_bytes[1], alarm_key="AlarmRain")
         # Oustide Alarms bits extraction, only 13 bits are used
-        
-        self.index_loop_through_data("AlarmIn", alarm_in_values, alarm_key="AlarmIn")
-        self.index_loop_through_data("AlarmRain", alarm_rain_values, alarm_key="AlarmRain")
-        self.index_loop_through_data("AlarmOut72", alarm_out_72, alarm_key="AlarmOut")
-        self.index_loop_through_data("AlarmOut73", alarm_out_73, alarm_key="AlarmOut")
+        self.index_loop_through_data("AlarmOut72", alarm_bytes[2], alarm_key="AlarmOut")
+        self.index_loop_through_data("AlarmOut73", alarm_bytes[3], alarm_key="AlarmOut")
 
         for i in range(1, 8):
             # AlarmExTempHum bits extraction, only 3 bits are used, but 7 bytes
-            data = self.raw_bytes[74 + i]
-            alarm_key = f'AlarmEx{i:02}' 
-            alarm_value = list_to_int(bytes_to_binary(data))
+            alarm_key = f'AlarmEx{i:02}'
             # Index matches position in alarm_value
-            self.index_loop_through_data("AlarmExTempHum", alarm_value, alarm_key)
-            
+            self.index_loop_through_data("AlarmExTempHum", alarm_bytes[4 + i], alarm_key)
+
             if i <= 4:
                 # AlarmSoilLeaf 8bits, 4 bytes
-                data = self.raw_bytes[81 + i]
                 alarm_key = f'Alarm{i:02d}'  # Format the key once and reuse it
-                alarm_value = int(bytes_to_binary(data)[0])
+                alarm_value = alarm_bytes[11 + i] >> 7
                 # Convert once, assign multiple times
                 self.loop_through_data("AlarmSoilLeaf", alarm_value, alarm_key)
 
@@ -288,27 +321,22 @@ class LoopDataParserRevB(DataParser):
         self.tuple_to_dict("LeafWetness")
         self.tuple_to_dict("SoilMoist")
         
-    def index_loop_through_data(self, type_name, alarm_value, alarm_key):
-        for index, key in self.type_keys[type_name].items():
-            self[f'{alarm_key}{key}'] = alarm_value[index] 
-    
+    def index_loop_through_data(self, type_name, alarm_byte, alarm_key):
+        for key, shift in _FLAT_KEYS[type_name]:
+            self[alarm_key + key] = (alarm_byte >> shift) & 1
+
     def loop_through_data(self, type_name, alarm_value, alarm_key):
-        for index, key in self.type_keys[type_name].items():
-            self[f'{alarm_key}{key}'] = alarm_value 
+        self.update((alarm_key + key, alarm_value)
+                    for key, _ in _FLAT_KEYS[type_name])
 
     def unpack_storm_date(self):
         '''Given a packed storm date field, unpack and return date.'''
-        date = bytes_to_binary(self.raw_bytes[48:50])
-        year = binary_to_int(date, 0, 7) + 2000
-        day = binary_to_int(date, 7, 12)
-        month = binary_to_int(date, 12, 16)
-        return f"{year}-{month}-{day}"
+        date, = _STORM_DATE.unpack_from(self.raw_bytes, 48)
+        return _unpack_storm_date(date)
     
     def unpack_time(self, time):
         '''Given a packed time field, unpack and return "HH:MM" string.'''
-        # format: HHMM, and space padded on the left.ex: "601" is 6:01 AM
-        hours, minutes = divmod(time, 100)
-        return f"{hours:02d}:{minutes:02d}"  # covert to "06:01"
+        return _unpack_time(time)
     
 
 
@@ -329,34 +357,34 @@ class ArchiveDataParserRevB(DataParser):
         ('ExtraTemps',    '3s'), ('SoilMoist',  '4s'),
     )
 
+    # Item names of the fields passed to tuple_to_dict
+    _EXPANDED = _expand_names(ARCHIVE_FORMAT, (
+        'SoilTemps', 'LeafTemps', 'ExtraTemps', 'SoilMoist', 'LeafWetness',
+        'ExtraHum'))
+
+    # Divisors of the scaled fields
+    _SCALES = (
+        ('TempOut', 10), ('TempOutHi', 10), ('TempOutLow', 10),
+        ('Barometer', 1000), ('TempIn', 10), ('UV', 10), ('ETHour', 1000),
+    )
+
     def __init__(self, data):
         super(ArchiveDataParserRevB, self).__init__(data, self.ARCHIVE_FORMAT)
-        self['raw_datestamp'] = bytes_to_binary(self.raw_bytes[0:4])
         self['Datetime'] = unpack_dmp_date_time(self['DateStamp'],
                                                 self['TimeStamp'])
         del self['DateStamp']
         del self['TimeStamp']
-        self['TempOut'] = self['TempOut'] / 10
-        self['TempOutHi'] = self['TempOutHi'] / 10
-        self['TempOutLow'] = self['TempOutLow'] / 10
-        self['Barometer'] = self['Barometer'] / 1000
-        self['TempIn'] = self['TempIn'] / 10
-        self['UV'] = self['UV'] / 10
-        self['ETHour'] = self['ETHour'] / 1000
+        self.scale(self._SCALES)
         '''
         self['WindHiDir'] = int(self['WindHiDir'] * 22.5)
         self['WindAvgDir'] = int(self['WindAvgDir'] * 22.5)
         '''
-        SoilTempsValues = struct.unpack(b'4B', self['SoilTemps'])
-        self['SoilTemps'] = tuple((t - 90) for t in SoilTempsValues)
-
-        self['ExtraHum'] = struct.unpack(b'2B', self['ExtraHum'])
-        self['SoilMoist'] = struct.unpack(b'4B', self['SoilMoist'])
-        LeafTempsValues = struct.unpack(b'2B', self['LeafTemps'])
-        self['LeafTemps'] = tuple((t - 90) for t in LeafTempsValues)
-        self['LeafWetness'] = struct.unpack(b'2B', self['LeafWetness'])
-        ExtraTempsValues = struct.unpack(b'3B', self['ExtraTemps'])
-        self['ExtraTemps'] = tuple((t - 90) for t in ExtraTempsValues)
+        self['SoilTemps'] = tuple((t - 90) for t in self['SoilTemps'])
+        self['ExtraHum'] = tuple(self['ExtraHum'])
+        self['SoilMoist'] = tuple(self['SoilMoist'])
+        self['LeafTemps'] = tuple((t - 90) for t in self['LeafTemps'])
+        self['LeafWetness'] = tuple(self['LeafWetness'])
+        self['ExtraTemps'] = tuple((t - 90) for t in self['ExtraTemps'])
         self.tuple_to_dict("SoilTemps")
         self.tuple_to_dict("LeafTemps")
         self.tuple_to_dict("ExtraTemps")
@@ -376,20 +404,33 @@ class DmpHeaderParser(DataParser):
 
 class DmpPageParser(DataParser):
     DMP_FORMAT = (
-        ('Index',   'B'),  ('Records',   '260s'),  ('unused',     '4B'),
+        ('Index',   'B'),  ('Records',   '260s'),  ('unused',     '4s'),
         ('CRC',   'H'),
     )
 
-    def __init__(self, data):
-        super(DmpPageParser, self).__init__(data, self.DMP_FORMAT)
+    def __init__(self, data, verify_crc=True):
+        super(DmpPageParser, self).__init__(data, self.DMP_FORMAT,
+                                            verify_crc=verify_crc)
 
 
 def pack_dmp_date_time(d):
     '''Pack `datetime` to DateStamp and TimeStamp VantagePro2 with CRC.'''
+    return append_crc(_DMP_DATE_TIME.pack(*dmp_date_time(d)))
+
+
+def dmp_date_time(d):
+    '''Return the VantagePro2 DateStamp and TimeStamp of `datetime`.'''
     vpdate = d.day + d.month * 32 + (d.year - 2000) * 512
     vptime = 100 * d.hour + d.minute
-    data = struct.pack(b'HH', vpdate, vptime)
-    return VantageProCRC(data).data_with_checksum
+    return vpdate, vptime
+
+
+def pack_dmp_date_time_to_key(d):
+    '''Pack `datetime` to an integer key built from its DateStamp and
+    TimeStamp. Keys compare like the datetimes they encode (to the minute),
+    so archive records can be filtered without decoding their stamps.'''
+    vpdate, vptime = dmp_date_time(d)
+    return vpdate << 16 | vptime
 
 
 def unpack_dmp_date_time(date, time):
@@ -402,15 +443,24 @@ def unpack_dmp_date_time(date, time):
         return datetime(year, month, day, hour, min_)
 
 
+def quick_key(raw_record):
+    '''Return the DateStamp and TimeStamp key of a raw archive record (see
+    `pack_dmp_date_time_to_key`), or None if it is not stamped.'''
+    date, time = _DMP_DATE_TIME.unpack_from(raw_record)
+    if date != 0xffff and time != 0xffff:
+        return date << 16 | time
+
+
 def pack_datetime(dtime):
     '''Returns packed `dtime` with CRC.'''
-    data = struct.pack(b'>BBBBBB', dtime.second, dtime.minute,
-                       dtime.hour, dtime.day, dtime.month, dtime.year - 1900)
-    return VantageProCRC(data).data_with_checksum
+    data = _DATETIME.pack(dtime.second, dtime.minute,
+                          dtime.hour, dtime.day, dtime.month, dtime.year - 1900)
+    return append_crc(data)
 
 
 def unpack_datetime(data):
     '''Return unpacked datetime `data` and check CRC.'''
-    VantageProCRC(data).check()
-    s, m, h, day, month, year = struct.unpack(b'>BBBBBB', data[:6])
+    if not crc_ok(data):
+        LOGGER.error("Check CRC : BAD")
+    s, m, h, day, month, year = _DATETIME.unpack_from(data)
     return datetime(year + 1900, month, day, h, m, s)
@@ -0,0 +1,58 @@
+# coding: utf8
+'''
+    pyvantagepro.tests.test_device
+    ------------------------------
+
+    The pyvantagepro test suite.
+
+    :copyright: Copyright 2012 Salem Harrache and contributors, see AUTHORS.
+    :license: GNU GPL v3.
+
+'''
+from __future__ import unicode_literals
+from datetime import datetime
+import struct
+
+from ..device import VantagePro2
+from ..parser import append_crc, pack_dmp_date_time
+
+
+def make_record(dtime):
+    '''Returns a 52 bytes archive record stamped with `dtime`.'''
+    date, time, _ = struct.unpack(b"HHH", pack_dmp_date_time(dtime))
+    return struct.pack(b"<HH", date, time) + bytes(range(48))
+
+
+def make_dump(dates):
+    '''Returns a raw dump with one page holding records for `dates`, the
+    remaining slots being left unwritten.'''
+    records = b''.join(make_record(d) for d in dates)
+    records += b'\xff' * (260 - len(records))
+    page = append_crc(b'\x00' + records + b'\x00' * 4)
+    header = append_crc(struct.pack(b"<HH", 1, 0))
+    return header + page
+
+
+def test_parse_dump(tmp_path):
+    '''Test parsing archives from a raw dump file.'''
+    dates = [datetime(2012, 10, 26, 10, m) for m in (20, 0, 5, 10)]
+    path = tmp_path / "dump.bin"
+    # a truncated trailing page must be ignored
+    data = make_dump(dates)
+    path.write_bytes(data + data[6:106])
+    items = VantagePro2.parse_dump(str(path), datetime(2012, 10, 26, 10, 4),
+                                   datetime(2012, 10, 26, 10, 15))
+    assert [item['Datetime'] for item in items] == dates[2:]
+    assert len(VantagePro2.parse_dump(str(path))) == 4
+    assert items[0]['TempOut'] == 25.6
+
+
+def test_parse_dump_bad_crc(tmp_path):
+    '''Test pages with a bad CRC are skipped.'''
+    data = bytearray(make_dump([datetime(2012, 10, 26, 10, 0)]))
+    data[10] ^= 0xff
+    path = tmp_path / "dump.bin"
+    good_page = make_dump([datetime(2012, 10, 26, 10, 5)])[6:]
+    path.write_bytes(bytes(data) + good_page)
+    items = VantagePro2.parse_dump(str(path))
+    assert [item['Datetime'] for item in items] == [datetime(2012, 10, 26, 10, 5)]
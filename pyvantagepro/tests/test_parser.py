@@ -15,9 +15,11 @@ import struct
 
 
 from ..logger import active_logger
-from ..parser import (LoopDataParserRevB, VantageProCRC, pack_datetime,
+from ..parser import (LoopDataParserRevB, VantageProCRC, crc16_ccitt,
+                      crc_ok, append_crc, pack_datetime,
                       unpack_datetime, pack_dmp_date_time,
-                      unpack_dmp_date_time)
+                      unpack_dmp_date_time, quick_key,
+                      pack_dmp_date_time_to_key)
 from ..utils import hex_to_bytes
 
 
@@ -25,20 +27,44 @@ from ..utils import hex_to_bytes
 active_logger()
 
 
+def reference_crc(data):
+    '''Bit by bit CRC-CCITT (polynomial 0x1021, initial value 0).'''
+    crc = 0
+    for byte in bytearray(data):
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021 if crc & 0x8000 else crc << 1) & 0xffff
+    return crc
+
+
+LOOP_DATA = "4C4F4FC4006802547B52031EFF7FFFFFFF7FFFFFFFFFFFFF" \
+            "FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF7F0000" \
+            "FFFF000000003C03000000000000FFFFFFFFFFFFFF000000" \
+            "0000000000000000000000000000008C00060C610183070A" \
+            "0D2A3C"
+
+
 class TestLoopDataParser:
     ''' Test parser.'''
     def setup_class(self):
         '''Setup common data.'''
-        self.data = "4C4F4FC4006802547B52031EFF7FFFFFFF7FFFFFFFFFFFFF" \
-                    "FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF7F0000" \
-                    "FFFF000000003C03000000000000FFFFFFFFFFFFFF000000" \
-                    "0000000000000000000000000000008C00060C610183070A" \
-                    "0D2A3C"
+        self.data = LOOP_DATA
         self.bytes = hex_to_bytes(self.data)
 
     def test_check_crc(self):
         '''Test crc verification.'''
         assert VantageProCRC(self.bytes).check()
+        assert crc_ok(self.bytes)
+        assert not crc_ok(self.bytes[:-1])
+        assert not crc_ok(b'')
+        assert append_crc(self.bytes[:-2]) == self.bytes
+
+    def test_crc_algorithm(self):
+        '''Test crc against the reference algorithm.'''
+        for size in range(len(self.bytes) + 1):
+            data = self.bytes[:size]
+            assert crc16_ccitt(data) == reference_crc(data)
+        assert crc16_ccitt(bytes(range(256))) == reference_crc(range(256))
 
     def test_check_raw_data(self):
         item = LoopDataParserRevB(self.bytes, datetime.now())
@@ -95,6 +121,15 @@ class TestLoopDataParser:
         assert item['WindSpeed10Min'] == 255
 
 
+def test_storm_date():
+    '''Test unpack storm start date.'''
+    data = LOOP_DATA
+    # 2012-06-07: month 6 (bits 15-12), day 7 (bits 11-7), year 12 (bits 6-0)
+    raw = hex_to_bytes(data[:96] + "8C63" + data[100:-4])
+    item = LoopDataParserRevB(VantageProCRC(raw).data_with_checksum, None)
+    assert item['StormStartDate'] == '2012-6-7'
+
+
 def test_datetime_parser():
     '''Test pack and unpack datetime.'''
     data = hex_to_bytes("25 35 0A 07 06 70 60 BA")
@@ -109,3 +144,13 @@ def test_dump_date_time():
     packed = pack_dmp_date_time(d)
     date, time, _ = struct.unpack(b"HHH", packed)
     assert d == unpack_dmp_date_time(date, time)
+
+
+def test_dump_date_time_key():
+    dates = [datetime(2012, 10, 26, 10, 10), datetime(2012, 10, 26, 23, 59),
+             datetime(2012, 10, 27, 0, 0), datetime(2013, 1, 1, 0, 0)]
+    keys = [pack_dmp_date_time_to_key(d) for d in dates]
+    assert keys == sorted(keys)
+    raw_record = pack_dmp_date_time(dates[0])[:4] + b"\x00" * 48
+    assert quick_key(raw_record) == keys[0]
+    assert quick_key(b"\xff" * 52) is None
@@ -115,6 +115,17 @@ class TestRetry:
         self.retries = 0
         assert self.retries_func(5) is False
 
+    def test_callable_delay(self):
+        '''Tests the delay is read before each new try.'''
+        delays = []
+
+        @retry(tries=3, delay=lambda: delays.append(0) or 0)
+        def func():
+            return False
+
+        assert func() is False
+        assert len(delays) == 2
+
 
 def test_bytes_to_hex():
     '''Tests byte <-> hex and hex <-> byte.'''
@@ -72,7 +72,8 @@ class retry(object):
     '''Retries a function or method until it returns True value.
     delay sets the initial delay in seconds, and backoff sets the factor by
     which the delay should lengthen after each failure.
-    Tries must be at least 0, and delay greater than 0.'''
+    Tries must be at least 0, and delay greater than 0. delay may also be a
+    callable returning the delay, read before each new try.'''
 
     def __init__(self, tries=3, delay=1):
         self.tries = tries
@@ -91,8 +92,9 @@ class retry(object):
                     if i == self.tries - 1:
                         # last chance
                         raise e
-                if self.delay > 0:
-                    time.sleep(self.delay)
+                delay = self.delay() if callable(self.delay) else self.delay
+                if delay > 0:
+                    time.sleep(delay)
         wrapped_f.__doc__ = f.__doc__
         wrapped_f.__name__ = f.__name__
         wrapped_f.__module__ = f.__module__